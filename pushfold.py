@@ -10,17 +10,24 @@ import json
 import random
 import itertools
 import math
+import os
 import statistics
 import sys
 from dataclasses import dataclass
-from typing import List, Dict, Optional, Literal
+from functools import lru_cache
+from types import MappingProxyType
+from typing import List, Dict, Mapping, Optional, Literal, Tuple
 
 # ---------------------------
 # === Структуры данных ===
 # ---------------------------
 
-@dataclass
+# frozen + __slots__: без __dict__ на экземпляр и хешируемо (ключ для кешей).
+# slots=True в @dataclass появился только в Python 3.10, поэтому слоты вручную.
+@dataclass(frozen=True)
 class Spot:
+    __slots__ = ("stacks_bb", "position", "players_left", "action_before", "sb", "bb", "ante",
+                 "bb_ante", "pko", "bounty_self", "bounty_op", "coverage")
     stacks_bb: float
     position: str
     players_left: int
@@ -35,8 +42,9 @@ class Spot:
     coverage: str  # self/op/full/none
 
 
-@dataclass
+@dataclass(frozen=True)
 class Advice:
+    __slots__ = ("hand", "decision_chart", "ev_push", "ev_fold", "decision_ev", "final", "notes")
     hand: str
     decision_chart: str
     ev_push: float
@@ -50,102 +58,254 @@ class Advice:
 # === Утилиты ===
 # ---------------------------
 
+# Решения чарта — общие строки, чтобы не создавать копии на каждый запрос
+PUSH = "PUSH"
+FOLD = "FOLD"
+NA = "N/A"
+
+RANKS = "AKQJT98765432"
+RANK_IDX = {r: i for i, r in enumerate(RANKS)}
+
+
+def _enumerate_169() -> List[str]:
+    """Все 169 стартовых рук: пары, одномастные и разномастные (старшая карта первой)"""
+    hands = []
+    for i, a in enumerate(RANKS):
+        hands.append(a + a)
+        for b in RANKS[i + 1:]:
+            hands.append(a + b + "s")
+            hands.append(a + b + "o")
+    return hands
+
+
+HANDS_169 = _enumerate_169()
+# Комбинаций из 1326: пара — 6, одномастная — 4, разномастная — 12
+HAND_WEIGHTS = [6 if len(h) == 2 else 4 if h.endswith("s") else 12 for h in HANDS_169]
+HAND_CUM_WEIGHTS = list(itertools.accumulate(HAND_WEIGHTS))
+
 def parse_hand_range(range_str: str) -> List[str]:
     """
     Простейший парсер диапазона рук (PokerStove/Equilab формат)
-    Поддерживает: 22+, A2s+, ATo+, KQo, QTs, и т.п.
+    Поддерживает: 22+, A2s+, ATo+, A2+, KQo, QTs, и т.п.
     """
     hands = []
-    ranks = "AKQJT98765432"
-    suited = ['s', 'o']
     for token in range_str.replace(" ", "").split(","):
         if not token:
             continue
-        if '+' in token and len(token) == 3:  # пример: A9o+
-            base = token[0:2]
-            s = token[2]
-            idx = ranks.index(base[1])
-            for r in ranks[idx::-1]:
-                hands.append(base[0] + r + s)
-        elif '+' in token and len(token) == 2:  # пример: 22+
-            idx = ranks.index(token[0])
-            for r in ranks[idx::-1]:
-                hands.append(r + r)
+        if token.endswith("+") and len(token) == 3 and token[0] == token[1]:  # пример: 22+
+            hands += [r + r for r in RANKS[RANK_IDX[token[0]]::-1]]
+        elif token.endswith("+") and len(token) in (3, 4):  # пример: A9o+, A2+
+            hi, lo = sorted(token[:2], key=RANK_IDX.__getitem__)  # "KAs+" == "AKs+"
+            suffixes = token[2] if len(token) == 4 else "so"
+            kickers = RANKS[RANK_IDX[hi] + 1:RANK_IDX[lo] + 1]
+            hands += [hi + r + s for r in reversed(kickers) for s in suffixes]
         else:
             hands.append(token)
-    return list(set(hands))
+    return list(dict.fromkeys(hands))
+
 
+def random_hand(rng: Optional[random.Random] = None) -> str:
+    """Случайная рука из 169 возможных (с учётом числа комбинаций)"""
+    return (rng or random).choices(HANDS_169, cum_weights=HAND_CUM_WEIGHTS)[0]
 
-def random_hand() -> str:
-    """Случайная рука из 169 возможных"""
-    ranks = "AKQJT98765432"
-    suits = ['s', 'o', '']
-    while True:
-        a, b = random.sample(ranks, 2)
-        if a == b:
-            return a + b
-        s = random.choice(['s', 'o'])
-        return a + b + s
+
+_COLORS = {"red": "\033[31m", "green": "\033[32m", "yellow": "\033[33m", "reset": "\033[0m"}
+# Проверяется один раз при импорте: если stdout перенаправят позже, флаг не обновится.
+# sys.stdout бывает None (pythonw, встроенные интерпретаторы) — тогда без цвета.
+_IS_TTY = bool(sys.stdout) and sys.stdout.isatty()
+# Готовые строки для решений — в выводе они встречаются чаще всего
+_COLORED = {(t, c): f"{_COLORS[c]}{t}{_COLORS['reset']}" for t in (PUSH, FOLD) for c in ("red", "green")}
 
 
 def colored(text: str, color: str) -> str:
     """Подсветка терминала (если поддерживается)"""
-    if not sys.stdout.isatty():
+    if not _IS_TTY:
         return text
-    colors = {"red": "\033[31m", "green": "\033[32m", "yellow": "\033[33m", "reset": "\033[0m"}
-    return f"{colors.get(color, '')}{text}{colors['reset']}"
+    wrapped = _COLORED.get((text, color))
+    if wrapped is None:
+        wrapped = f"{_COLORS.get(color, '')}{text}{_COLORS['reset']}"
+    return wrapped
+
+
+def write_lines(lines: List[str]):
+    """Вывод блока строк одним write + flush вместо серии print()"""
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
 
 
 # ---------------------------
 # === Работа с чартом ===
 # ---------------------------
 
-def load_chart(path: Optional[str]) -> Dict:
-    """Загрузка чарта из CSV/JSON либо дефолт"""
+# Числовые id позиций/действий/рук для упаковки ключа чарта в одно int
+_POSITION_IDS: Dict[str, int] = {}
+_ACTION_IDS: Dict[str, int] = {}
+_HAND_IDS: Dict[str, int] = {h: i for i, h in enumerate(HANDS_169)}
+# 169 стандартных рук + запас под нестандартные метки (комбо вроде "AsKs", "KAs" и т.п.)
+_MAX_HAND_IDS = 1 << 16
+
+
+def _intern_id(table: Dict[str, int], name: str, limit: int) -> int:
+    """Выдаёт стабильный id для имени (новый — при первом появлении)"""
+    idx = table.get(name)
+    if idx is None:
+        idx = len(table)
+        if idx >= limit:
+            raise ValueError(f"Слишком много различных значений в чарте: {name}")
+        table[name] = idx
+    return idx
+
+
+def _pack_chart_key(stack: int, pos_id: int, act_id: int, hand_id: int) -> int:
+    """(стек, позиция, действие, рука) -> один int-ключ"""
+    return ((stack * 10000 + pos_id * 100 + act_id) << 16) | hand_id
+
+
+def _add_chart_row(chart: Dict[int, str], stack_bb, position: str, action_before: str, hand: str, decision: str):
+    key = _pack_chart_key(
+        int(stack_bb),
+        _intern_id(_POSITION_IDS, position, 100),
+        _intern_id(_ACTION_IDS, action_before, 100),
+        _intern_id(_HAND_IDS, hand, _MAX_HAND_IDS),
+    )
+    chart[key] = sys.intern(decision.upper())
+
+
+_CHART_CACHE_VERSION = 2
+
+
+def _ids_compatible(names: List[str], table: Dict[str, int], limit: int) -> bool:
+    """Совпадают ли id из кеша с id текущего процесса (таблицы не меняются)"""
+    current = list(table)
+    n = min(len(names), len(current))
+    return len(names) <= limit and len(set(names)) == len(names) and names[:n] == current[:n]
+
+
+def _load_chart_cache(path: str) -> Optional[Dict[int, str]]:
+    """Чарт из файла-кеша path + ".cache.json", если он не старше исходника"""
+    cache = path + ".cache.json"
+    try:
+        if os.path.getmtime(cache) < os.path.getmtime(path):
+            return None
+        with open(cache, encoding="utf-8") as f:
+            data = json.load(f)
+        if data["version"] != _CHART_CACHE_VERSION:
+            return None
+        tables = ((data["positions"], _POSITION_IDS, 100),
+                  (data["actions"], _ACTION_IDS, 100),
+                  (data["hands"], _HAND_IDS, _MAX_HAND_IDS))
+        chart = {int(k): sys.intern(str(d)) for k, d in zip(data["keys"], data["decisions"])}
+    except (OSError, ValueError, TypeError, KeyError):
+        return None
+    # Ключи упакованы id позиций/действий/рук — кеш годен, только если id те же
+    if not all(_ids_compatible(names, table, limit) for names, table, limit in tables):
+        return None
+    for names, table, limit in tables:
+        for name in names:
+            _intern_id(table, name, limit)
+    return chart
+
+
+def _save_chart_cache(path: str, chart: Dict[int, str]):
+    payload = {
+        "version": _CHART_CACHE_VERSION,
+        "positions": list(_POSITION_IDS),
+        "actions": list(_ACTION_IDS),
+        "hands": list(_HAND_IDS),
+        "keys": list(chart),
+        "decisions": list(chart.values()),
+    }
+    try:
+        with open(path + ".cache.json", "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+    except OSError:
+        pass  # нет прав на запись рядом с чартом — просто работаем без кеша
+
+
+@lru_cache(maxsize=4)
+def load_chart(path: Optional[str]) -> Mapping[int, str]:
+    """
+    Загрузка чарта из CSV/JSON либо дефолт (плоский dict: упакованный ключ -> решение).
+    Результат кешируется, поэтому отдаётся только для чтения.
+    """
     if not path:
-        # Минималистичный встроенный чарт (для примера)
-        return {
-            (10, "SB", "none"): {"A2s": "PUSH", "A9o": "PUSH", "KTo": "FOLD"},
-            (10, "BTN", "none"): {"A2s": "PUSH", "A8o": "PUSH", "K9s": "PUSH", "K9o": "FOLD"},
-        }
+        return _DEFAULT_CHART
+    chart = {}
+    if not path.endswith((".csv", ".json")):
+        raise ValueError("Неверный формат чарта (только CSV или JSON)")
+    cached = _load_chart_cache(path)
+    if cached is not None:
+        return MappingProxyType(cached)
     if path.endswith(".csv"):
-        chart = {}
         with open(path, newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
+            reader = csv.reader(f)
+            header = next(reader, [])
+            if not header:
+                return MappingProxyType(chart)  # пустой файл — пустой чарт, как с DictReader
+            idx = {c: i for i, c in enumerate(header)}
+            columns = ("stack_bb", "position", "action_before", "hand", "decision")
+            for c in columns:
+                if c not in idx:
+                    raise ValueError(f"Неверный формат чарта (нет колонки {c})")
+            cols = [idx[c] for c in columns]
             for row in reader:
-                key = (int(row["stack_bb"]), row["position"], row["action_before"])
-                chart.setdefault(key, {})[row["hand"]] = row["decision"].upper()
-        return chart
-    if path.endswith(".json"):
+                if row:
+                    _add_chart_row(chart, *[row[i] for i in cols])
+    else:
         with open(path, encoding="utf-8") as f:
             data = json.load(f)
-        chart = {}
         for row in data:
-            key = (int(row["stack_bb"]), row["position"], row["action_before"])
-            chart.setdefault(key, {})[row["hand"]] = row["decision"].upper()
-        return chart
-    raise ValueError("Неверный формат чарта (только CSV или JSON)")
+            _add_chart_row(chart, row["stack_bb"], row["position"], row["action_before"], row["hand"], row["decision"])
+    _save_chart_cache(path, chart)
+    return MappingProxyType(chart)
 
 
-def eval_spot_chart(hand: str, spot: Spot, chart: Dict) -> str:
+def _spot_chart_key(stacks_bb: float, position: str, action_before: str, hand: str) -> Optional[int]:
+    """Упакованный ключ чарта (None — такой позиции/действия/руки нет ни в одном чарте)"""
+    pos_id = _POSITION_IDS.get(position)
+    act_id = _ACTION_IDS.get(action_before)
+    hand_id = _HAND_IDS.get(hand)
+    if pos_id is None or act_id is None or hand_id is None:
+        return None
+    return _pack_chart_key(int(round(stacks_bb)), pos_id, act_id, hand_id)
+
+
+def eval_spot_chart(hand: str, spot: Spot, chart: Mapping[int, str]) -> str:
     """Возвращает PUSH/FOLD/N/A по чарту"""
-    key = (int(round(spot.stacks_bb)), spot.position, spot.action_before)
-    if key not in chart:
-        return "N/A"
-    return chart[key].get(hand, "N/A")
+    key = _spot_chart_key(spot.stacks_bb, spot.position, spot.action_before, hand)
+    if key is None:
+        return NA
+    return chart.get(key, NA)
+
+
+def _build_default_chart() -> Mapping[int, str]:
+    """Минималистичный встроенный чарт (для примера)"""
+    chart = {}
+    for hand, decision in {"A2s": PUSH, "A9o": PUSH, "KTo": FOLD}.items():
+        _add_chart_row(chart, 10, "SB", "none", hand, decision)
+    for hand, decision in {"A2s": PUSH, "A8o": PUSH, "K9s": PUSH, "K9o": FOLD}.items():
+        _add_chart_row(chart, 10, "BTN", "none", hand, decision)
+    return MappingProxyType(chart)
+
+
+# Собирается один раз при импорте; load_chart(None) всегда отдаёт этот же объект
+_DEFAULT_CHART = _build_default_chart()
 
 
 # ---------------------------
 # === Простая симуляция EV ===
 # ---------------------------
 
-def hand_strength_estimate(hand: str) -> float:
+# Ранг -> 0..1 (двойка = 0, туз = 1), без линейного поиска по строке
+_RANK_NORM = {r: i / 12 for i, r in enumerate("23456789TJQKA")}
+
+
+def _hand_strength(hand: str) -> float:
     """
     Примитивная эвристика силы руки (0..1)
     Просто для демо, не настоящая эквити!
     """
-    ranks = "23456789TJQKA"
-    base = ranks.index(hand[0]) / 12
+    base = _RANK_NORM[hand[0]]
     if len(hand) == 2 and hand[0] == hand[1]:  # пара
         return 0.85 + base * 0.05
     suited = hand.endswith("s")
@@ -157,22 +317,169 @@ def hand_strength_estimate(hand: str) -> float:
     return 0.5
 
 
-def eval_spot_ev(hand: str, spot: Spot, iterations: int = 10000, seed: Optional[int] = None) -> (float, float):
-    """Оценка EV пуша (в bb) через псевдо-симуляцию"""
-    if seed:
-        random.seed(seed)
-    equity = hand_strength_estimate(hand)
+# Рук всего 169 — эвристика считается один раз при импорте
+HAND_STRENGTH: Dict[str, float] = {h: _hand_strength(h) for h in HANDS_169}
+
+
+def hand_strength_estimate(hand: str) -> float:
+    """Сила руки из таблицы HAND_STRENGTH (для нестандартной записи — эвристика)"""
+    strength = HAND_STRENGTH.get(hand)
+    if strength is None:
+        return _hand_strength(hand)
+    return strength
+
+
+# Карты в кодировке Cactus Kev — один int на карту:
+#   бит ранга (16 + r) | бит масти (0x1000..0x8000) | r << 8 | простое число ранга,
+# r: 0 = двойка … 12 = туз. Произведение простых однозначно задаёт набор рангов руки.
+PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+SUIT_BITS = (0x1000, 0x2000, 0x4000, 0x8000)
+DECK = [(1 << (16 + r)) | SUIT_BITS[s] | (r << 8) | PRIMES[r] for r in range(13) for s in range(4)]
+
+# Сила не-флешевой руки по произведению простых (заполняется по мере встречаемости)
+_RANK_SCORES: Dict[int, int] = {}
+
+def _score(category: int, *ranks: int) -> int:
+    """Категория комбинации + до 5 рангов-кикеров в одном int (больше — сильнее)"""
+    score = category
+    for i in range(5):
+        score = (score << 4) | (ranks[i] if i < len(ranks) else 0)
+    return score
+
+
+def _straight_high(mask: int) -> int:
+    """Старший ранг стрита в битовой маске рангов (-1, если стрита нет)"""
+    m = (mask << 1) | (mask >> 12)  # туз играет и как младшая карта
+    for high in range(13, 3, -1):
+        if (m >> (high - 4)) & 0x1F == 0x1F:
+            return high - 1
+    return -1
+
+
+def _top_ranks(mask: int, k: int) -> List[int]:
+    return [r for r in range(12, -1, -1) if mask >> r & 1][:k]
+
+
+def _rank_score(cards: List[int]) -> int:
+    """Сила 7 карт без учёта мастей (флеш проверяется отдельно)"""
+    counts = [0] * 13
+    rank_mask = 0
+    for c in cards:
+        counts[(c >> 8) & 0xF] += 1
+        rank_mask |= c >> 16
+    groups = sorted(((n, r) for r, n in enumerate(counts) if n), reverse=True)
+    n1, r1 = groups[0]
+    if n1 == 4:
+        return _score(7, r1, max(r for _, r in groups[1:]))
+    n2, r2 = groups[1]
+    if n1 == 3 and n2 >= 2:
+        return _score(6, r1, r2)
+    high = _straight_high(rank_mask)
+    if high >= 0:
+        return _score(4, high)
+    if n1 == 3:
+        return _score(3, r1, r2, groups[2][1])
+    if n1 == 2 and n2 == 2:
+        return _score(2, r1, r2, max(r for _, r in groups[2:]))
+    if n1 == 2:
+        return _score(1, r1, r2, groups[2][1], groups[3][1])
+    return _score(0, *[r for _, r in groups[:5]])
+
+
+def _eval7(cards: List[int]) -> int:
+    """Сила лучшей пятикарточной комбинации из 7 карт"""
+    # Из 7 карт флеш несовместим с каре и фулл-хаусом, поэтому проверяем его первым
+    suits = [c & 0xF000 for c in cards]
+    for bit in SUIT_BITS:
+        if suits.count(bit) >= 5:
+            mask = 0
+            for c in cards:
+                if c & bit:
+                    mask |= c >> 16
+            high = _straight_high(mask)
+            if high >= 0:
+                return _score(8, high)
+            return _score(5, *_top_ranks(mask, 5))
+    product = 1
+    for c in cards:
+        product *= c & 0xFF
+    score = _RANK_SCORES.get(product)
+    if score is None:
+        score = _RANK_SCORES[product] = _rank_score(cards)
+    return score
+
+
+def _hole_cards(hand: str) -> List[int]:
+    """Конкретные карты для руки из 169 (масти не важны, важна одномастность)"""
+    hi, lo = 12 - RANK_IDX[hand[0]], 12 - RANK_IDX[hand[1]]
+    return [DECK[hi * 4], DECK[lo * 4 + (0 if hand.endswith("s") else 1)]]
+
+
+def hand_equity(hand: str, iterations: int = 10000, rng: Optional[random.Random] = None) -> float:
+    """Эквити руки против случайной руки (хедз-ап, Монте-Карло по раздачам)"""
+    if iterations <= 0:
+        return hand_strength_estimate(hand)
+    hole = _hole_cards(hand)
+    deck = [c for c in DECK if c not in hole]
+    sample = (rng or random.Random()).sample
+    won = 0.0
+    for _ in range(iterations):
+        cards = sample(deck, 7)  # 2 карты оппонента + 5 карт борда
+        hero = _eval7(hole + cards[2:])
+        villain = _eval7(cards)
+        if hero > villain:
+            won += 1.0
+        elif hero == villain:
+            won += 0.5
+    return won / iterations
+
+
+def _ev_push_kernel(equity: float, p_call: float, pot_pre: float, stack: float, iterations: int,
+                    rng: random.Random) -> float:
+    """
+    Внутренний цикл Монте-Карло: считает только число исходов
+    (фолд / выигранный колл / проигранный колл), EV собирается в конце.
+    """
+    if iterations <= 0:
+        # без симуляции — точное матожидание той же модели
+        return (1 - p_call) * pot_pre + p_call * (equity * (pot_pre + stack) - (1 - equity) * stack)
+    rnd = rng.random
+    calls = wins = 0
+    for _ in range(iterations):
+        if rnd() < p_call:
+            calls += 1
+            if rnd() < equity:
+                wins += 1
+    folds = iterations - calls
+    return (folds * pot_pre + wins * (pot_pre + stack) - (calls - wins) * stack) / iterations
+
+
+@lru_cache(maxsize=256)
+def _spot_terms(spot: Spot) -> Tuple[float, float, float]:
+    """
+    Всё, что в EV зависит только от спота, считается один раз на спот:
+    (вероятность колла, банк до пуша, бонус PKO на единицу эквити).
+    """
     # вероятность колла — зависит от позиции и количества игроков (очень грубо)
     p_call = min(0.25 + 0.05 * (9 - spot.players_left), 0.5)
     pot_pre = spot.sb + spot.bb + (spot.bb if spot.bb_ante else spot.ante * spot.players_left)
-    ev_fold = 0.0
-    ev_push = (1 - p_call) * pot_pre + p_call * (equity * (pot_pre + spot.stacks_bb) - (1 - equity) * spot.stacks_bb)
+    # Упрощённая PKO коррекция: bounty_ev = equity * bounty_op / 10 (грубо в bb)
+    bounty_per_equity = spot.bounty_op / 10.0 if spot.pko and spot.coverage == "self" else 0.0
+    return p_call, pot_pre, bounty_per_equity
 
-    # Упрощённая PKO коррекция
-    if spot.pko and spot.coverage == "self":
-        bounty_ev = equity * spot.bounty_op / 10.0  # грубо в bb
-        ev_push += bounty_ev
 
+def eval_spot_ev(hand: str, spot: Spot, iterations: int = 10000, seed: Optional[int] = None,
+                 equity_model: Literal["heuristic", "mc"] = "heuristic") -> (float, float):
+    """Оценка EV пуша (в bb) через Монте-Карло симуляцию"""
+    rng = random.Random(seed)  # локальный генератор: глобальный random не трогаем
+    if equity_model == "mc":
+        equity = hand_equity(hand, iterations, rng)
+    else:
+        equity = hand_strength_estimate(hand)
+    p_call, pot_pre, bounty_per_equity = _spot_terms(spot)
+    ev_fold = 0.0
+    ev_push = _ev_push_kernel(equity, p_call, pot_pre, spot.stacks_bb, iterations, rng)
+    ev_push += equity * bounty_per_equity
     return ev_push, ev_fold
 
 
@@ -180,10 +487,9 @@ def eval_spot_ev(hand: str, spot: Spot, iterations: int = 10000, seed: Optional[
 # === Основные режимы ===
 # ---------------------------
 
-def advisor_mode(args):
-    chart = load_chart(args.chart)
-    hand = args.hand or random_hand()
-    spot = Spot(
+def spot_from_args(args) -> Spot:
+    """Спот из аргументов CLI (один раз на запуск, дальше переиспользуется)"""
+    return Spot(
         stacks_bb=args.stacks_bb,
         position=args.position,
         players_left=args.players_left,
@@ -197,40 +503,65 @@ def advisor_mode(args):
         bounty_op=args.bounty_op,
         coverage=args.coverage,
     )
-    decision_chart = eval_spot_chart(hand, spot, chart)
-    ev_push, ev_fold = eval_spot_ev(hand, spot, args.iterations, args.rng_seed)
-    decision_ev = "PUSH" if ev_push > ev_fold else "FOLD"
 
-    delta = ev_push - ev_fold
+
+def advise(hand: str, spot: Spot, chart: Mapping[int, str], iterations: int, seed: Optional[int] = None,
+           equity_model: Literal["heuristic", "mc"] = "heuristic") -> Advice:
+    """Решение по чарту и по EV; при расхождении больше 0.15bb (или без чарта) побеждает EV"""
+    decision_chart = eval_spot_chart(hand, spot, chart)
+    ev_push, ev_fold = eval_spot_ev(hand, spot, iterations, seed, equity_model)
+    decision_ev = PUSH if ev_push > ev_fold else FOLD
     final = decision_chart
-    if decision_chart == "N/A" or abs(ev_push - ev_fold) > 0.15:
+    if decision_chart == NA or abs(ev_push - ev_fold) > 0.15:
         final = decision_ev
+    return Advice(hand, decision_chart, ev_push, ev_fold, decision_ev, final, {})
 
-    # Цветной вывод
-    color = "green" if final == "PUSH" else "red"
-    print(f"\n--- PUSH/FOLD ADVISOR ---")
-    print(f"Spot: {spot.stacks_bb:.1f}bb | {spot.position} | {spot.players_left}-max | action={spot.action_before}")
-    print(f"Hand: {hand}")
-    print(f"Chart: {decision_chart} | EV: {decision_ev} (Δ={delta:.2f}bb)")
-    print(f"Final Decision: {colored(final, color)}")
-    print(f"EV_push={ev_push:.3f}bb  EV_fold={ev_fold:.3f}bb")
+
+def advisor_mode(args):
+    chart = load_chart(args.chart)
+    hand = args.hand or random_hand()
+    spot = spot_from_args(args)
+    advice = advise(hand, spot, chart, args.iterations, args.rng_seed, args.equity)
+    decision_chart, decision_ev, final = advice.decision_chart, advice.decision_ev, advice.final
+    ev_push, ev_fold = advice.ev_push, advice.ev_fold
+    delta = ev_push - ev_fold
+
+    # Цветной вывод — одной записью в stdout
+    color = "green" if final == PUSH else "red"
+    lines = [
+        "",
+        "--- PUSH/FOLD ADVISOR ---",
+        f"Spot: {spot.stacks_bb:.1f}bb | {spot.position} | {spot.players_left}-max | action={spot.action_before}",
+        f"Hand: {hand}",
+        f"Chart: {decision_chart} | EV: {decision_ev} (Δ={delta:.2f}bb)",
+        f"Final Decision: {colored(final, color)}",
+        f"EV_push={ev_push:.3f}bb  EV_fold={ev_fold:.3f}bb",
+    ]
     if spot.pko:
-        print(f"PKO mode: bounty_op={spot.bounty_op}, coverage={spot.coverage}")
-    print()
+        lines.append(f"PKO mode: bounty_op={spot.bounty_op}, coverage={spot.coverage}")
+    lines.append("")
+    write_lines(lines)
 
 def quiz_mode(args):
     chart = load_chart(args.chart)
     total = 0
     correct = 0
     hands = ["A2s", "A9o", "KTo", "QTs", "77", "ATo", "K9s", "A5s", "55", "JTo"]
+    questions = 10
+
+    # Все вопросы и правильные ответы готовятся заранее, до первого input()
+    rng = random.Random(args.rng_seed)
+    quiz_hands = rng.choices(hands, k=questions)
+    quiz_positions = rng.choices(["SB", "BTN", "CO"], k=questions)
+    quiz_stacks = rng.choices([8, 10, 12], k=questions)
+    answers = [
+        eval_spot_chart(hand, Spot(stacks, pos, 8, "none", 0.5, 1.0, 0.125, True, False, 0, 0, "none"), chart)
+        for hand, pos, stacks in zip(quiz_hands, quiz_positions, quiz_stacks)
+    ]
 
     print("=== PUSH/FOLD QUIZ ===")
-    for i in range(1, 11):
-        hand = random.choice(hands)
-        pos = random.choice(["SB", "BTN", "CO"])
-        stacks = random.choice([8, 10, 12])
-        spot = Spot(stacks, pos, 8, "none", 0.5, 1.0, 0.125, True, False, 0, 0, "none")
-        decision_chart = eval_spot_chart(hand, spot, chart)
+    for i, (hand, pos, stacks, decision_chart) in enumerate(
+            zip(quiz_hands, quiz_positions, quiz_stacks, answers), 1):
         print(f"\n{i}) {stacks}bb, {pos}, hand={hand}")
         ans = input("Ваш выбор (PUSH/FOLD): ").strip().upper()
         if ans == decision_chart:
@@ -244,26 +575,43 @@ def quiz_mode(args):
 
 def sim_mode(args):
     hand = args.hand or random_hand()
-    spot = Spot(
-        stacks_bb=args.stacks_bb,
-        position=args.position,
-        players_left=args.players_left,
-        action_before=args.action_before,
-        sb=args.sb,
-        bb=args.bb,
-        ante=args.ante,
-        bb_ante=args.bb_ante,
-        pko=args.pko,
-        bounty_self=args.bounty_self,
-        bounty_op=args.bounty_op,
-        coverage=args.coverage,
-    )
-    ev_push, ev_fold = eval_spot_ev(hand, spot, args.iterations, args.rng_seed)
-    print(f"\n--- SIMULATION ---")
-    print(f"Hand: {hand}, Stack: {spot.stacks_bb}bb, Pos: {spot.position}")
-    print(f"EV_push = {ev_push:.3f} bb")
-    print(f"EV_fold = {ev_fold:.3f} bb")
-    print(f"Δ = {ev_push - ev_fold:.3f} bb\n")
+    spot = spot_from_args(args)
+    ev_push, ev_fold = eval_spot_ev(hand, spot, args.iterations, args.rng_seed, args.equity)
+    write_lines([
+        "",
+        "--- SIMULATION ---",
+        f"Hand: {hand}, Stack: {spot.stacks_bb}bb, Pos: {spot.position}",
+        f"EV_push = {ev_push:.3f} bb",
+        f"EV_fold = {ev_fold:.3f} bb",
+        f"Δ = {ev_push - ev_fold:.3f} bb",
+        "",
+    ])
+
+
+def batch_mode(args):
+    """N случайных рук в одном споте -> CSV с решениями (в --out или stdout)"""
+    chart = load_chart(args.chart)
+    spot = spot_from_args(args)
+    rng = random.Random(args.rng_seed)
+    hands = [random_hand(rng) for _ in range(args.n)]
+
+    # Спот общий, поэтому симуляция нужна один раз на каждую различную руку (их не больше 169)
+    advice = {
+        hand: advise(hand, spot, chart, args.iterations, rng.getrandbits(64), args.equity)
+        for hand in dict.fromkeys(hands)
+    }
+
+    out = open(args.out, "w", newline="", encoding="utf-8") if args.out else sys.stdout
+    try:
+        writer = csv.writer(out, lineterminator="\n")
+        writer.writerow(["hand", "decision_chart", "ev_push", "ev_fold", "decision_ev", "final"])
+        writer.writerows(
+            [a.hand, a.decision_chart, f"{a.ev_push:.3f}", f"{a.ev_fold:.3f}", a.decision_ev, a.final]
+            for a in map(advice.__getitem__, hands)
+        )
+    finally:
+        if out is not sys.stdout:
+            out.close()
 
 
 # ---------------------------
@@ -272,7 +620,7 @@ def sim_mode(args):
 
 def main():
     parser = argparse.ArgumentParser(description="Push/Fold тренажёр для PokerOK (GG Network)")
-    parser.add_argument("--mode", choices=["advisor", "quiz", "sim"], default="advisor")
+    parser.add_argument("--mode", choices=["advisor", "quiz", "sim", "batch"], default="advisor")
     parser.add_argument("--hand", type=str, help="Рука в формате AKs, ATo, 55")
     parser.add_argument("--stacks-bb", type=float, default=10)
     parser.add_argument("--position", type=str, default="CO")
@@ -288,7 +636,11 @@ def main():
     parser.add_argument("--coverage", choices=["self", "op", "full", "none"], default="none")
     parser.add_argument("--chart", type=str, help="Путь к CSV/JSON чарту")
     parser.add_argument("--iterations", type=int, default=10000)
+    parser.add_argument("--equity", choices=["heuristic", "mc"], default="heuristic",
+                        help="Модель эквити: эвристика или Монте-Карло по раздачам")
     parser.add_argument("--rng-seed", type=int, help="Seed для генератора случайных чисел")
+    parser.add_argument("--n", type=int, default=1000, help="Количество рук в режиме batch")
+    parser.add_argument("--out", type=str, help="CSV-файл для результатов режима batch (по умолчанию stdout)")
 
     args = parser.parse_args()
 
@@ -298,6 +650,8 @@ def main():
         quiz_mode(args)
     elif args.mode == "sim":
         sim_mode(args)
+    elif args.mode == "batch":
+        batch_mode(args)
     else:
         parser.print_help()
 